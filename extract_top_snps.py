@@ -4,66 +4,144 @@ Quick script to extract top SNPs from PLINK association results
 More efficient than bash sort for large files
 """
 
+import os
 import sys
+import numpy as np
 import pandas as pd
 
+# PyArrow is optional; when available its C++ writer is used for the outputs
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pv
+except ImportError:
+    pa = None
+
+# Narrow dtypes for the standard PLINK .assoc columns (P stays float64 so
+# very small p-values do not underflow, and is numeric even when the file
+# has no data rows)
+ASSOC_DTYPES = {
+    'CHR': 'int8',
+    'BP': 'int32',
+    'P': 'float64',
+    'A1': 'category',
+    'A2': 'category',
+}
+
+# Rows parsed per chunk; memory use is bounded by this rather than file size
+CHUNK_SIZE = 1_000_000
+
+def append_tsv(df, out, header=False):
+    """Append DataFrame rows to an open binary file as tab-separated text"""
+    # Header is written by hand so column names stay unquoted, as with pandas
+    if header:
+        out.write(('\t'.join(map(str, df.columns)) + '\n').encode())
+    
+    if pa is None:
+        out.write(df.to_csv(sep='\t', index=False, header=False).encode())
+        return
+    
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    options = pv.WriteOptions(include_header=False, delimiter='\t',
+                              quoting_style='none')
+    pv.write_csv(table, out, write_options=options)
+
+def write_tsv(df, output_file):
+    """Write a DataFrame to a tab-separated file without the index"""
+    with open(output_file, 'wb') as out:
+        append_tsv(df, out, header=True)
+
 def extract_top_snps(input_file, output_prefix, n_top=1000):
     """Extract top N SNPs by p-value from association file"""
     
     print(f"Reading association file: {input_file}")
     
-    # Read the association file
+    out_summary = f"{output_prefix}/summary_statistics.txt"
+    tmp_summary = f"{out_summary}.tmp"
+    n_total = 0
+    n_valid = 0
+    top_1000 = None
+    gw_parts = []
+    sugg_parts = []
+    
+    # Stream the association file in chunks (PLINK pads columns with runs of
+    # spaces, which the C parser splits natively given the '\s+' separator).
+    # Only the running top N and the threshold hits stay in memory; summary
+    # statistics are written out chunk by chunk to a temporary file that only
+    # replaces the real one once the whole input has been parsed.
     try:
-        df = pd.read_csv(input_file, delim_whitespace=True)
+        reader = pd.read_csv(input_file, sep=r'\s+', engine='c',
+                             dtype=ASSOC_DTYPES, chunksize=CHUNK_SIZE)
+        with open(tmp_summary, 'wb') as summary_out:
+            for chunk in reader:
+                first_chunk = top_1000 is None
+                if first_chunk:
+                    # Get the p-value column name (usually 'P' or column 9)
+                    p_col = 'P' if 'P' in chunk.columns else chunk.columns[8]
+                    top_1000 = chunk.iloc[:0]
+                    empty = chunk.iloc[:0]
+                
+                n_total += len(chunk)
+                
+                # Remove NA values
+                chunk = chunk[chunk[p_col].notna()]
+                n_valid += len(chunk)
+                
+                # Merge this chunk's best rows into the running top N (partial
+                # selection; nsmallest keeps the rows ordered by p-value)
+                top_1000 = pd.concat([top_1000, chunk.nsmallest(n_top, p_col)])
+                top_1000 = top_1000.nsmallest(n_top, p_col)
+                
+                # Threshold masks: one pass over the p-values finds the
+                # suggestive rows, and the genome-wide significant rows are
+                # a subset of those
+                pvals = chunk[p_col].to_numpy()
+                sugg_idx = np.flatnonzero(pvals < 1e-5)
+                gw_idx = sugg_idx[pvals[sugg_idx] < 5e-8]
+                if len(sugg_idx):
+                    sugg_parts.append(chunk.iloc[sugg_idx])
+                if len(gw_idx):
+                    gw_parts.append(chunk.iloc[gw_idx])
+                
+                # Summary statistics
+                summary = chunk[['CHR', 'SNP', 'BP', 'A1', p_col]]
+                summary.columns = ['CHR', 'SNP', 'BP', 'A1', 'P']
+                append_tsv(summary, summary_out, header=first_chunk)
+        os.replace(tmp_summary, out_summary)
     except Exception as e:
         print(f"Error reading file: {e}")
+        if os.path.exists(tmp_summary):
+            os.remove(tmp_summary)
         return
     
-    print(f"Total SNPs in file: {len(df)}")
-    
-    # Get the p-value column name (usually 'P' or column 9)
-    p_col = 'P' if 'P' in df.columns else df.columns[8]
-    
-    # Remove NA values
-    df_clean = df[df[p_col].notna()].copy()
-    print(f"SNPs with valid p-values: {len(df_clean)}")
-    
-    # Sort by p-value
-    df_sorted = df_clean.sort_values(by=p_col)
+    print(f"Total SNPs in file: {n_total}")
+    print(f"SNPs with valid p-values: {n_valid}")
+    print(f"Summary statistics saved to: {out_summary}")
     
     # Extract top 1000
-    top_1000 = df_sorted.head(n_top)
     out_1000 = f"{output_prefix}/top_1000_snps.txt"
-    top_1000.to_csv(out_1000, sep='\t', index=False)
+    write_tsv(top_1000, out_1000)
     print(f"Top 1000 SNPs saved to: {out_1000}")
     
     # Extract top 100
-    top_100 = df_sorted.head(100)
+    top_100 = top_1000.head(100)
     out_100 = f"{output_prefix}/top_100_snps.txt"
-    top_100.to_csv(out_100, sep='\t', index=False)
+    write_tsv(top_100, out_100)
     print(f"Top 100 SNPs saved to: {out_100}")
     
     # Genome-wide significant (p < 5e-8)
-    gw_sig = df_clean[df_clean[p_col] < 5e-8]
+    gw_sig = pd.concat(gw_parts) if gw_parts else empty
     out_gw = f"{output_prefix}/genome_wide_significant_snps_5e-8.txt"
-    gw_sig.to_csv(out_gw, sep='\t', index=False)
+    write_tsv(gw_sig, out_gw)
     print(f"Genome-wide significant SNPs (p<5e-8): {len(gw_sig)}")
     print(f"Saved to: {out_gw}")
     
     # Suggestive (p < 1e-5)
-    suggestive = df_clean[df_clean[p_col] < 1e-5]
+    suggestive = pd.concat(sugg_parts) if sugg_parts else empty
     out_sugg = f"{output_prefix}/suggestive_snps_1e-5.txt"
-    suggestive.to_csv(out_sugg, sep='\t', index=False)
+    write_tsv(suggestive, out_sugg)
     print(f"Suggestive SNPs (p<1e-5): {len(suggestive)}")
     print(f"Saved to: {out_sugg}")
     
-    # Summary statistics
-    out_summary = f"{output_prefix}/summary_statistics.txt"
-    summary = df_clean[['CHR', 'SNP', 'BP', 'A1', p_col]].copy()
-    summary.columns = ['CHR', 'SNP', 'BP', 'A1', 'P']
-    summary.to_csv(out_summary, sep='\t', index=False)
-    print(f"Summary statistics saved to: {out_summary}")
-    
     print("\nExtraction complete!")
     return len(gw_sig), len(suggestive)
 
@@ -75,7 +153,10 @@ if __name__ == "__main__":
     input_file = sys.argv[1]
     output_dir = sys.argv[2]
     
-    gw, sugg = extract_top_snps(input_file, output_dir)
+    result = extract_top_snps(input_file, output_dir)
+    if result is None:
+        sys.exit(1)
+    gw, sugg = result
     
     print(f"\n=== Summary ===")
     print(f"Genome-wide significant: {gw}")
@@ -2,54 +2,206 @@
 """
 Generate GWAS visualization plots and reports
 Requires: matplotlib, seaborn, pandas, numpy
+Optional: datashader (faster Manhattan plots for large files)
 """
 
+import os
 import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import pandas as pd
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Non-interactive backend
 import matplotlib.pyplot as plt
+from matplotlib.colors import to_rgba
 import seaborn as sns
 from pathlib import Path
 
-def manhattan_plot(assoc_file, output_file, title="Manhattan Plot"):
-    """Create Manhattan plot from association results"""
-    print(f"Creating Manhattan plot from {assoc_file}")
-    
-    # Read association data
-    df = pd.read_csv(assoc_file, delim_whitespace=True)
-    
+# Datashader is optional; when available, large Manhattan plots are
+# rasterised into a single image instead of one marker per SNP
+try:
+    import datashader as ds
+    import datashader.transfer_functions as tf
+except ImportError:
+    ds = None
+
+# Minimum number of SNPs before the Manhattan plot is rasterised with
+# datashader (measured break-even against the decimated plot path; below it
+# datashader's fixed cost dominates)
+RASTER_MIN_POINTS = 5_000_000
+
+# Alternating chromosome colors, as hex and as RGBA with the point alpha
+CHR_COLORS_HEX = ('#1f77b4', '#ff7f0e')
+CHR_COLORS = np.array([to_rgba(color, alpha=0.6) for color in CHR_COLORS_HEX],
+                      dtype=np.float32)
+
+# Resolution of all saved figures (also sets the Manhattan decimation grid);
+# the Manhattan and Q-Q point layers are rasterized, text stays vector
+PLOT_DPI = 150
+
+# Q-Q plots draw every one of the top ranks and a log-spaced sample of the
+# remaining ranks, which is indistinguishable at plot resolution
+QQ_TOP_RANKS = 10000
+QQ_TAIL_POINTS = 2000
+
+# Columns of a PLINK .assoc file used by the Manhattan and Q-Q plots
+ASSOC_COLUMNS = ('CHR', 'SNP', 'BP', 'P')
+ASSOC_DTYPES = {'CHR': 'int8', 'BP': 'int32'}
+
+# Scratch buffer for -log10(p) values, grown as needed and reused by every
+# Manhattan and Q-Q plot made in this process
+_minlog10_buffer = np.empty(0, dtype=np.float32)
+
+def minus_log10(pvals):
+    """Return -log10(pvals) as float32, computed in place in a shared buffer"""
+    global _minlog10_buffer
+    if len(_minlog10_buffer) < len(pvals):
+        _minlog10_buffer = np.empty(len(pvals), dtype=np.float32)
+    
+    out = _minlog10_buffer[:len(pvals)]
+    np.log10(pvals, out=out)
+    np.negative(out, out=out)
+    return out
+
+# Manhattan and Q-Q figures are created once per process and redrawn for
+# every association file instead of being rebuilt each time
+_reusable_axes = {}
+
+def reusable_axes(name, figsize, **margins):
+    """Return a cleared Axes on a figure that is kept open for reuse"""
+    if name not in _reusable_axes:
+        fig, ax = plt.subplots(figsize=figsize)
+        fig.subplots_adjust(**margins)
+        _reusable_axes[name] = ax
+    
+    ax = _reusable_axes[name]
+    ax.cla()
+    return ax
+
+def read_assoc(assoc_file):
+    """Read the plotting columns from a PLINK association file (when there
+    is no P column the p-values are taken from column 9 and renamed to P)"""
+    header = pd.read_csv(assoc_file, sep=r'\s+', engine='c', nrows=0).columns
+    if 'P' in header:
+        p_col = 'P'
+    elif len(header) > 8:
+        p_col = header[8]
+    else:
+        raise ValueError(f"no P column and fewer than 9 columns in {assoc_file}")
+    
+    usecols = [col for col in ASSOC_COLUMNS if col in header and col != 'P']
+    df = pd.read_csv(assoc_file, sep=r'\s+', engine='c',
+                     usecols=usecols + [p_col],
+                     dtype={**ASSOC_DTYPES, p_col: 'float64'})
+    return df.rename(columns={p_col: 'P'})
+
+def rasterize_points(ax, x, y, groups, colors, marker_size, alpha=0.6,
+                     extra_y=()):
+    """Draw points on an axis as one datashader image, colored by group and
+    rendered at the axes' pixel size in the saved figure (the y limits also
+    cover extra_y, e.g. reference lines drawn afterwards)"""
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y, groups = x[finite], y[finite], groups[finite]
+    
+    # Let matplotlib pick the limits (with its usual margins) as if the points
+    # were plotted, then cover exactly that area with one canvas pixel per
+    # output pixel
+    y_lo, y_hi = np.min([y.min(), *extra_y]), np.max([y.max(), *extra_y])
+    ax.update_datalim([(x.min(), y_lo), (x.max(), y_hi)])
+    ax.autoscale_view()
+    x_range, y_range = ax.get_xlim(), ax.get_ylim()
+    bbox = ax.get_window_extent()
+    scale = PLOT_DPI / ax.figure.dpi
+    
+    points = pd.DataFrame({'x': x, 'y': y, 'group': pd.Categorical(groups)})
+    cvs = ds.Canvas(plot_width=int(bbox.width * scale) + 1,
+                    plot_height=int(bbox.height * scale) + 1,
+                    x_range=x_range, y_range=y_range)
+    agg = cvs.points(points, 'x', 'y', ds.count_cat('group'))
+    
+    # Every hit pixel gets the point alpha, then grows to the marker radius
+    img = tf.shade(agg, color_key=colors, alpha=int(alpha * 255),
+                   min_alpha=int(alpha * 255))
+    radius = int(round(marker_size * PLOT_DPI / 72 / 2))
+    img = tf.spread(img, px=radius, shape='circle')
+    
+    ax.imshow(img.to_pil(), extent=(*x_range, *y_range), aspect='auto',
+              interpolation='nearest')
+    ax.set_xlim(x_range)
+    ax.set_ylim(y_range)
+
+def decimate_points(x, y, groups, width, height):
+    """Return sorted indices keeping one point per (group, pixel) cell"""
+    if len(x) == 0:
+        return np.arange(0)
+    
+    x_min, y_min = x.min(), y.min()
+    x_span = max(float(x.max() - x_min), 1e-12)
+    y_span = max(float(y.max() - y_min), 1e-12)
+    px = ((x - x_min) * ((width - 1) / x_span)).astype(np.int64)
+    py = ((y - y_min) * ((height - 1) / y_span)).astype(np.int64)
+    
+    cell = (groups.astype(np.int64) * height + py) * width + px
+    _, keep = np.unique(cell, return_index=True)
+    return np.sort(keep)
+
+def manhattan_plot(df, output_file, title="Manhattan Plot", ax=None):
+    """Create Manhattan plot from association results, drawing on ax (or a
+    reused Manhattan figure) after clearing it"""
     # Get p-value column
     p_col = 'P' if 'P' in df.columns else df.columns[8]
     
-    # Remove NA values
-    df = df[df[p_col].notna()].copy()
-    
-    # Calculate -log10(p-value)
-    df['MINLOG10P'] = -np.log10(df[p_col])
-    df = df[df['MINLOG10P'].notna()]
+    # Remove NA (and negative) p-values
+    pvals = df[p_col].to_numpy()
+    df = df.iloc[np.flatnonzero(pvals >= 0)]
     
     # Sort by chromosome and position
     df = df.sort_values(['CHR', 'BP'])
     
-    # Create chromosome colors
-    df['IND'] = range(len(df))
-    df_grouped = df.groupby('CHR')
-    
-    # Create figure
-    fig, ax = plt.subplots(figsize=(16, 6))
-    
-    # Plot each chromosome
-    colors = ['#1f77b4', '#ff7f0e']
-    x_labels = []
-    x_labels_pos = []
-    
-    for num, (name, group) in enumerate(df_grouped):
-        color = colors[num % len(colors)]
-        ax.scatter(group['IND'], group['MINLOG10P'], c=color, s=5, alpha=0.6, edgecolors='none')
-        x_labels.append(str(name))
-        x_labels_pos.append((group['IND'].iloc[0] + group['IND'].iloc[-1]) / 2)
+    # Calculate -log10(p-value); plot coordinates are kept as compact
+    # standalone arrays. p = 0 has no finite -log10, so those rows are left
+    # out of the plot (but still count as top SNPs)
+    pvals = df[p_col].to_numpy()
+    plotted = np.flatnonzero(np.isfinite(pvals) & (pvals > 0))
+    mlog = minus_log10(pvals[plotted])
+    ind = np.arange(len(plotted), dtype=np.int32)
+    chr_arr = df['CHR'].to_numpy()[plotted]
+    
+    # Chromosome label positions and alternating color index
+    chroms, starts = np.unique(chr_arr, return_index=True)
+    ends = np.append(starts[1:], len(chr_arr))
+    x_labels = [str(name) for name in chroms]
+    x_labels_pos = ((starts + ends - 1) / 2).tolist()
+    parity = np.repeat(np.arange(len(chroms)) % 2, ends - starts)
+    
+    # Create (or reuse) figure
+    if ax is None:
+        ax = reusable_axes('manhattan', (16, 6), left=0.06, right=0.98,
+                           bottom=0.1, top=0.93)
+    else:
+        ax.cla()
+    fig = ax.figure
+    
+    # Plot all chromosomes at once (marker size matches the previous
+    # scatter s=5)
+    marker_size = np.sqrt(5)
+    if ds is not None and len(ind) >= RASTER_MIN_POINTS:
+        rasterize_points(ax, ind, mlog, parity, list(CHR_COLORS_HEX), marker_size,
+                         extra_y=-np.log10([5e-8, 1e-5]))
+    else:
+        # Points that land on the same output pixel are drawn only once
+        bbox = ax.get_window_extent()
+        scale = PLOT_DPI / fig.dpi
+        keep = decimate_points(ind, mlog, parity, int(bbox.width * scale) + 1,
+                               int(bbox.height * scale) + 1)
+        # One marker line per color is much cheaper to draw than a scatter
+        # collection
+        for group in (0, 1):
+            sel = keep[parity[keep] == group]
+            ax.plot(ind[sel], mlog[sel], marker='o', ms=marker_size, mew=0,
+                    linestyle='none', color=CHR_COLORS[group], rasterized=True)
     
     # Genome-wide significance line
     ax.axhline(y=-np.log10(5e-8), color='red', linestyle='--', linewidth=1, label='p=5e-8')
@@ -64,23 +216,42 @@ def manhattan_plot(assoc_file, output_file, title="Manhattan Plot"):
     ax.legend(loc='upper right')
     ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    plt.close()
+    fig.savefig(output_file, dpi=PLOT_DPI)
     
     print(f"Manhattan plot saved to: {output_file}")
     
-    # Return top SNPs
-    top_snps = df.nsmallest(10, p_col)[['CHR', 'SNP', 'BP', p_col]]
+    # Return top SNPs (partial selection, then sort only the selected rows;
+    # every row tied with the 10th p-value is a candidate so ties resolve in
+    # row order, as with nsmallest)
+    pvals = df[p_col].to_numpy()
+    if len(pvals) <= 10:
+        idx = np.arange(len(pvals))
+    else:
+        kth = np.partition(pvals, 9)[9]
+        idx = np.flatnonzero(pvals <= kth)
+    idx = idx[np.argsort(pvals[idx], kind='stable')][:10]
+    top_snps = df.iloc[idx][['CHR', 'SNP', 'BP', p_col]]
     return top_snps
 
-def qq_plot(assoc_file, output_file, title="Q-Q Plot"):
-    """Create Q-Q plot from association results"""
-    print(f"Creating Q-Q plot from {assoc_file}")
-    
-    # Read association data
-    df = pd.read_csv(assoc_file, delim_whitespace=True)
-    
+def manhattan_plot_from_file(assoc_file, output_file, title="Manhattan Plot"):
+    """Create Manhattan plot from an association results file"""
+    print(f"Creating Manhattan plot from {assoc_file}")
+    return manhattan_plot(read_assoc(assoc_file), output_file, title=title)
+
+def qq_ranks(n):
+    """Return the 1-based Q-Q ranks to plot: every top rank plus a
+    log-spaced selection of the remaining ones"""
+    top = np.arange(1, min(QQ_TOP_RANKS, n) + 1)
+    if n <= QQ_TOP_RANKS:
+        return top
+    
+    tail = np.rint(np.geomspace(QQ_TOP_RANKS + 1, n, num=QQ_TAIL_POINTS))
+    tail = np.unique(np.clip(tail.astype(np.int64), QQ_TOP_RANKS + 1, n))
+    return np.concatenate([top, tail])
+
+def qq_plot(df, output_file, title="Q-Q Plot", ax=None):
+    """Create Q-Q plot from association results, drawing on ax (or a reused
+    Q-Q figure) after clearing it"""
     # Get p-value column
     p_col = 'P' if 'P' in df.columns else df.columns[8]
     
@@ -88,25 +259,35 @@ def qq_plot(assoc_file, output_file, title="Q-Q Plot"):
     pvals = df[df[p_col].notna()][p_col].values
     pvals = pvals[pvals > 0]  # Remove zeros
     
-    # Calculate observed -log10(p)
-    observed = -np.log10(pvals)
-    observed = np.sort(observed)
+    # Calculate observed -log10(p), sorted in place in the shared buffer and
+    # read largest first so that rank r pairs with -log10(r / (n + 1))
+    observed = minus_log10(pvals)
+    observed.sort()
+    observed = observed[::-1]
     
-    # Calculate expected -log10(p)
+    # Calculate expected -log10(p) on the plotted ranks only
     n = len(observed)
-    expected = -np.log10(np.arange(1, n + 1) / (n + 1))
+    ranks = qq_ranks(n)
+    expected = -np.log10(ranks / (n + 1))
+    observed = observed[ranks - 1]
     
     # Calculate lambda (genomic inflation factor) correctly
     # Convert p-values to chi-square statistics (for 1 df)
+    # (isf avoids the 1 - p round-off that turns tiny p-values into inf)
     from scipy import stats
-    chisq_stats = stats.chi2.ppf(1 - pvals, 1)
+    chisq_stats = stats.chi2.isf(pvals, 1)
     # Lambda GC is the ratio of observed to expected median chi-square
     lambda_gc = np.median(chisq_stats) / stats.chi2.ppf(0.5, 1) if len(chisq_stats) > 0 else 1.0
     
-    # Create plot
-    fig, ax = plt.subplots(figsize=(8, 8))
+    # Create (or reuse) plot
+    if ax is None:
+        ax = reusable_axes('qq', (8, 8), left=0.1, right=0.96,
+                           bottom=0.08, top=0.9)
+    else:
+        ax.cla()
     
-    ax.scatter(expected, observed, s=10, alpha=0.6, edgecolors='none')
+    ax.plot(expected, observed, marker='o', ms=np.sqrt(10), mew=0, alpha=0.6,
+            linestyle='none', rasterized=True)
     
     # Diagonal line
     max_val = max(expected.max(), observed.max())
@@ -119,39 +300,50 @@ def qq_plot(assoc_file, output_file, title="Q-Q Plot"):
     ax.legend(loc='upper left')
     ax.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
-    plt.close()
+    ax.figure.savefig(output_file, dpi=PLOT_DPI)
     
     print(f"Q-Q plot saved to: {output_file}")
     return lambda_gc
 
+def qq_plot_from_file(assoc_file, output_file, title="Q-Q Plot"):
+    """Create Q-Q plot from an association results file"""
+    print(f"Creating Q-Q plot from {assoc_file}")
+    return qq_plot(read_assoc(assoc_file), output_file, title=title)
+
+def read_plink_columns(plink_file, columns):
+    """Read numeric columns from a whitespace-delimited PLINK table with a
+    header line; columns are given by name or by position"""
+    with open(plink_file) as f:
+        header = f.readline().split()
+    
+    usecols = [header.index(col) if isinstance(col, str) else col for col in columns]
+    return np.loadtxt(plink_file, skiprows=1, usecols=usecols, ndmin=2)
+
 def pca_plot(pca_file, output_file):
     """Create PCA plot"""
     print(f"Creating PCA plot from {pca_file}")
     
     # Read PCA data
-    df = pd.read_csv(pca_file, delim_whitespace=True)
+    pcs = read_plink_columns(pca_file, (2, 3, 4))
     
     # Create figure with subplots
-    fig, axes = plt.subplots(1, 2, figsize=(14, 6))
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6), constrained_layout=True)
     
     # PC1 vs PC2
-    axes[0].scatter(df.iloc[:, 2], df.iloc[:, 3], s=20, alpha=0.6, edgecolors='none')
+    axes[0].scatter(pcs[:, 0], pcs[:, 1], s=20, alpha=0.6, edgecolors='none')
     axes[0].set_xlabel('PC1', fontsize=11)
     axes[0].set_ylabel('PC2', fontsize=11)
     axes[0].set_title('PC1 vs PC2', fontsize=12, fontweight='bold')
     axes[0].grid(True, alpha=0.3)
     
     # PC2 vs PC3
-    axes[1].scatter(df.iloc[:, 3], df.iloc[:, 4], s=20, alpha=0.6, edgecolors='none')
+    axes[1].scatter(pcs[:, 1], pcs[:, 2], s=20, alpha=0.6, edgecolors='none')
     axes[1].set_xlabel('PC2', fontsize=11)
     axes[1].set_ylabel('PC3', fontsize=11)
     axes[1].set_title('PC2 vs PC3', fontsize=12, fontweight='bold')
     axes[1].grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=PLOT_DPI)
     plt.close()
     
     print(f"PCA plot saved to: {output_file}")
@@ -161,14 +353,14 @@ def missingness_plot(lmiss_file, imiss_file, output_file):
     print(f"Creating missingness plots")
     
     # Read missingness data
-    snp_miss = pd.read_csv(lmiss_file, delim_whitespace=True)
-    ind_miss = pd.read_csv(imiss_file, delim_whitespace=True)
+    snp_fmiss = read_plink_columns(lmiss_file, ('F_MISS',))[:, 0]
+    ind_fmiss = read_plink_columns(imiss_file, ('F_MISS',))[:, 0]
     
     # Create figure
-    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5), constrained_layout=True)
     
     # SNP missingness
-    axes[0].hist(snp_miss['F_MISS'], bins=50, edgecolor='black', alpha=0.7)
+    axes[0].hist(snp_fmiss, bins=50, edgecolor='black', alpha=0.7)
     axes[0].axvline(x=0.02, color='red', linestyle='--', label='Threshold=0.02')
     axes[0].set_xlabel('SNP Missingness Rate', fontsize=11)
     axes[0].set_ylabel('Frequency', fontsize=11)
@@ -177,7 +369,7 @@ def missingness_plot(lmiss_file, imiss_file, output_file):
     axes[0].grid(True, alpha=0.3)
     
     # Individual missingness
-    axes[1].hist(ind_miss['F_MISS'], bins=50, edgecolor='black', alpha=0.7)
+    axes[1].hist(ind_fmiss, bins=50, edgecolor='black', alpha=0.7)
     axes[1].axvline(x=0.02, color='red', linestyle='--', label='Threshold=0.02')
     axes[1].set_xlabel('Individual Missingness Rate', fontsize=11)
     axes[1].set_ylabel('Frequency', fontsize=11)
@@ -185,12 +377,64 @@ def missingness_plot(lmiss_file, imiss_file, output_file):
     axes[1].legend()
     axes[1].grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    plt.savefig(output_file, dpi=PLOT_DPI)
     plt.close()
     
     print(f"Missingness plots saved to: {output_file}")
 
+def assoc_label(filename):
+    """Create a readable label from an association file name"""
+    if 'noQC' in filename:
+        return 'No QC'
+    elif 'withQC' in filename:
+        return 'With QC'
+    elif 'logistic' in filename and '3PCs' in filename:
+        return 'Logistic 3PCs'
+    elif 'logistic' in filename and '10PCs' in filename:
+        return 'Logistic 10PCs'
+    elif 'logistic' in filename:
+        return 'Logistic'
+    else:
+        return 'Standard'
+
+def process_assoc_file(assoc_file_path, output_dir, label):
+    """Create Manhattan and Q-Q plots for one association file, naming the
+    outputs and results after label"""
+    results = {}
+    filename = assoc_file_path.name
+    
+    print(f"\n--- Processing {label} ({filename}) ---")
+    
+    # Read the association file once for both plots
+    try:
+        df = read_assoc(assoc_file_path)
+    except Exception as e:
+        print(f"Error reading {filename}: {e}")
+        return results
+    
+    # Manhattan plot
+    manhattan_out = output_dir / f"manhattan_plot_{label.replace(' ', '_').lower()}.png"
+    try:
+        print(f"Creating Manhattan plot from {filename}")
+        top_snps = manhattan_plot(df, str(manhattan_out), 
+                                 title=f"Manhattan Plot ({label})")
+        results[f'{label}_top_snps'] = top_snps
+    except Exception as e:
+        print(f"Error creating Manhattan plot for {label}: {e}")
+    
+    # Q-Q plot
+    qq_out = output_dir / f"qq_plot_{label.replace(' ', '_').lower()}.png"
+    try:
+        print(f"Creating Q-Q plot from {filename}")
+        lambda_gc = qq_plot(df, str(qq_out), 
+                           title=f"Q-Q Plot ({label})")
+        results[f'{label}_lambda'] = lambda_gc
+        print(f"Genomic inflation factor (λ): {lambda_gc:.3f}")
+    except Exception as e:
+        print(f"Error creating Q-Q plot for {label}: {e}")
+    
+    return results
+
 def main(assoc_dir, qc_dir, output_dir):
     """Generate all plots"""
     
@@ -213,43 +457,27 @@ def main(assoc_dir, qc_dir, output_dir):
     
     print(f"Found {len(assoc_files)} association files: {[f.name for f in assoc_files]}")
     
-    # Process each association file
-    for assoc_file_path in assoc_files:
-        # Create a readable label from filename
-        filename = assoc_file_path.name
-        if 'noQC' in filename:
-            label = 'No QC'
-        elif 'withQC' in filename:
-            label = 'With QC'
-        elif 'logistic' in filename and '3PCs' in filename:
-            label = 'Logistic 3PCs'
-        elif 'logistic' in filename and '10PCs' in filename:
-            label = 'Logistic 10PCs'
-        elif 'logistic' in filename:
-            label = 'Logistic'
-        else:
-            label = 'Standard'
-        
-        print(f"\n--- Processing {label} ({filename}) ---")
-        
-        # Manhattan plot
-        manhattan_out = output_dir / f"manhattan_plot_{label.replace(' ', '_').lower()}.png"
-        try:
-            top_snps = manhattan_plot(str(assoc_file_path), str(manhattan_out), 
-                                     title=f"Manhattan Plot ({label})")
-            results[f'{label}_top_snps'] = top_snps
-        except Exception as e:
-            print(f"Error creating Manhattan plot for {label}: {e}")
-        
-        # Q-Q plot
-        qq_out = output_dir / f"qq_plot_{label.replace(' ', '_').lower()}.png"
-        try:
-            lambda_gc = qq_plot(str(assoc_file_path), str(qq_out), 
-                               title=f"Q-Q Plot ({label})")
-            results[f'{label}_lambda'] = lambda_gc
-            print(f"Genomic inflation factor (λ): {lambda_gc:.3f}")
-        except Exception as e:
-            print(f"Error creating Q-Q plot for {label}: {e}")
+    # Warm up matplotlib's font cache before the worker processes start
+    fig, ax = plt.subplots()
+    ax.set_title('warm-up', fontweight='bold')
+    fig.canvas.draw()
+    plt.close(fig)
+    
+    # Files that would share a label (and so the same plot names and result
+    # keys) get their file stem appended, so no two workers write the same
+    # output
+    labels = [assoc_label(f.name) for f in assoc_files]
+    label_counts = Counter(labels)
+    labels = [f"{label} {f.stem}" if label_counts[label] > 1 else label
+              for label, f in zip(labels, assoc_files)]
+    
+    # Process the association files in parallel; each one is read and
+    # plotted independently, and the Agg backend is safe to use per process
+    max_workers = min(3, len(assoc_files), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for file_results in executor.map(process_assoc_file, assoc_files,
+                                         repeat(output_dir), labels):
+            results.update(file_results)
     
     # PCA plot
     pca_file = Path(qc_dir) / 'AA_GWAS_hg19_uniq_pca.eigenvec'
@@ -83,6 +83,22 @@ if command -v python3 &>/dev/null; then
     else
         echo -e "${YELLOW}WARN${NC} - Install with: pip install seaborn (optional)"
     fi
+    
+    echo -n "Testing: Python pyarrow... "
+    if python3 -c "import pyarrow" 2>/dev/null; then
+        echo -e "${GREEN}PASS${NC}"
+        ((pass_count++))
+    else
+        echo -e "${YELLOW}WARN${NC} - Install with: pip install pyarrow (optional)"
+    fi
+    
+    echo -n "Testing: Python datashader... "
+    if python3 -c "import datashader" 2>/dev/null; then
+        echo -e "${GREEN}PASS${NC}"
+        ((pass_count++))
+    else
+        echo -e "${YELLOW}WARN${NC} - Install with: pip install datashader (optional)"
+    fi
 fi
 
 echo ""